@@ -2,14 +2,10 @@ import os
 import subprocess
 import sys
 import logging
-from fuzzywuzzy import process
+from rapidfuzz import process, fuzz, utils
 import asyncio
-try:
-    import pygetwindow as gw
-except ImportError:
-    gw = None
-
 from langchain.tools import tool
+from Jarvis_window_CTRL import desktop_lock, focus_window, index_items
 
 sys.stdout.reconfigure(encoding='utf-8')
 
@@ -17,62 +13,49 @@ sys.stdout.reconfigure(encoding='utf-8')
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-async def focus_window(title_keyword: str) -> bool:
-    if not gw:
-        logger.warning("⚠ pygetwindow")
-        return False
-
-    await asyncio.sleep(1.5)
-    title_keyword = title_keyword.lower().strip()
-
-    for window in gw.getAllWindows():
-        if title_keyword in window.title.lower():
-            if window.isMinimized:
-                window.restore()
-            window.activate()
-            logger.info(f"🪟 window focus में है: {window.title}")
-            return True
-    logger.warning("⚠ Focus करने के लिए window नहीं मिली।")
-    return False
-
 async def index_files(base_dirs):
-    file_index = []
-    for base_dir in base_dirs:
-        for root, _, files in os.walk(base_dir):
-            for f in files:
-                file_index.append({
-                    "name": f,
-                    "path": os.path.join(root, f),
-                    "type": "file"
-                })
-    logger.info(f"✅ {base_dirs} से कुल {len(file_index)} files को index किया गया।")
+    # Reuses Jarvis_window_CTRL's cached walk, so there is one scan of the drive and
+    # folder_file's invalidate_index() after a rename/delete applies here too
+    items = await index_items(base_dirs)
+    file_index = [item for item in items if item.type == "file"]
+    logger.info("✅ %s से कुल %s files को index किया गया।", base_dirs, len(file_index))
     return file_index
 
 async def search_file(query, index):
-    choices = [item["name"] for item in index]
-    if not choices:
+    if not index:
         logger.warning("⚠ Match करने के लिए कोई files नहीं हैं।")
         return None
 
-    best_match, score = process.extractOne(query, choices)
-    logger.info(f"🔍 Matched '{query}' to '{best_match}' (Score: {score})")
-    if score > 70:
-        for item in index:
-            if item["name"] == best_match:
-                return item
-    return None
+    # dict choices make extractOne return the key, so no second scan is needed.
+    # Scoring every filename is CPU-bound, so it also runs off the event loop.
+    match = await asyncio.to_thread(
+        process.extractOne,
+        utils.default_process(query),
+        {i: item.name_norm for i, item in enumerate(index)},
+        scorer=fuzz.WRatio,
+        processor=None,
+        score_cutoff=70,
+    )
+    if match is None:
+        logger.info("🔍 '%s' के लिए कोई match नहीं मिला।", query)
+        return None
+    _, score, key = match
+    item = index[key]
+    logger.info("🔍 Matched '%s' to '%s' (Score: %s)", query, item.name, score)
+    return item
 
 async def open_file(item):
     try:
-        logger.info(f"📂 File खोल रहे हैं: {item['path']}")
-        if os.name == 'nt':
-            os.startfile(item["path"])
-        else:
-            subprocess.call(['open' if sys.platform == 'darwin' else 'xdg-open', item["path"]])
-        await focus_window(item["name"])  # 👈 Focus window after opening
-        return f"✅ File open हो गई।: {item['name']}"
+        logger.info("📂 File खोल रहे हैं: %s", item.path)
+        async with desktop_lock:
+            if os.name == 'nt':
+                os.startfile(item.path)
+            else:
+                subprocess.call(['open' if sys.platform == 'darwin' else 'xdg-open', item.path])
+            await focus_window(item.name)  # 👈 Focus window after opening
+        return f"✅ File open हो गई।: {item.name}"
     except Exception as e:
-        logger.error(f"❌ File open करने में error आया।: {e}")
+        logger.error("❌ File open करने में error आया।: %s", e)
         return f"❌ File open करने में विफल रहा। {e}"
 
 async def handle_command(command, index):
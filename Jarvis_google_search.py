@@ -2,9 +2,8 @@ import os
 import requests
 import logging
 from dotenv import load_dotenv
-from livekit.agents import function_tool  # ✅ Correct decorator
 from datetime import datetime
-from livekit import agents
+from langchain.tools import tool
 
 # Load environment variables
 load_dotenv()
@@ -13,14 +12,6 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-import os
-import requests
-import logging
-from livekit.agents import function_tool
-from langchain.tools import tool
-
-logger = logging.getLogger(__name__)
-
 @tool
 async def google_search(query: str) -> str:
     """
@@ -28,7 +19,7 @@ async def google_search(query: str) -> str:
     No raw links are included to make speech output sound natural.
     """
 
-    logger.info(f"Query प्राप्त हुई: {query}")
+    logger.info("Query प्राप्त हुई: %s", query)
 
     api_key = os.getenv("GOOGLE_SEARCH_API_KEY")
     search_engine_id = os.getenv("SEARCH_ENGINE_ID")
@@ -53,11 +44,11 @@ async def google_search(query: str) -> str:
         logger.info("Google Custom Search API को request भेजी जा रही है...")
         response = requests.get(url, params=params, timeout=10)
     except requests.exceptions.RequestException as e:
-        logger.error(f"Request failed: {e}")
+        logger.error("Request failed: %s", e)
         return f"Google Search API request failed: {e}"
 
     if response.status_code != 200:
-        logger.error(f"Google API error: {response.status_code} - {response.text}")
+        logger.error("Google API error: %s - %s", response.status_code, response.text)
         return f"Google Search API में error आया: {response.status_code} - {response.text}"
 
     data = response.json()
@@ -1,16 +1,23 @@
 import os
+import re
+import json
 import subprocess
 import logging
 import sys
 import asyncio
-from fuzzywuzzy import process
+import time
+from collections import deque
+from typing import NamedTuple
+from rapidfuzz import process, fuzz, utils
 
 try:
     import win32gui
     import win32con
+    import pywintypes
 except ImportError:
     win32gui = None
     win32con = None
+    pywintypes = None
 
 try:
     import pygetwindow as gw
@@ -42,65 +49,244 @@ APP_MAPPINGS = {
 # -------------------------
 # Global focus utility
 # -------------------------
+FOCUS_POLL_DELAYS = (0.05, 0.1, 0.2, 0.4, 0.8)  # ~1.5s worst case, as before
+
+# Desktop side effects (launching, focusing, closing, keyboard/mouse) never overlap, even across
+# concurrent thinking_capability calls. Ordering within one agent turn comes from
+# jarvis_reasoning awaiting the tool calls sequentially, not from this lock.
+desktop_lock = asyncio.Lock()
+
+# HWNDs of windows we focused, keyed by lowercased title keyword, so close_app can skip enumeration
+_window_handles = {}
+
 async def focus_window(title_keyword: str) -> bool:
     if not gw:
         logger.warning("⚠ pygetwindow")
         return False
 
-    await asyncio.sleep(1.5)  # Give time for window to appear
     title_keyword = title_keyword.lower().strip()
 
-    for window in gw.getAllWindows():
-        if title_keyword in window.title.lower():
-            if window.isMinimized:
-                window.restore()
-            window.activate()
-            return True
+    # Poll with backoff while the window appears instead of always waiting 1.5s
+    for delay in FOCUS_POLL_DELAYS:
+        await asyncio.sleep(delay)
+        for window in gw.getAllWindows():
+            if title_keyword in window.title.lower():
+                if window.isMinimized:
+                    window.restore()
+                window.activate()
+                hwnd = getattr(window, "_hWnd", None)
+                if hwnd:
+                    _window_handles[title_keyword] = hwnd
+                return True
     return False
 
 # Index files/folders
+INDEX_CACHE_TTL = 300  # seconds
+INDEX_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".jarvis", "index.json")
+INDEX_SNAPSHOT_VERSION = 1  # bump whenever IndexItem's fields change
+_index_cache = {}
+
+class IndexItem(NamedTuple):
+    """One indexed file/folder; a slot-only tuple instead of a per-item dict."""
+    name: str
+    name_norm: str
+    path: str
+    type: str
+
+class ItemIndex(list):
+    """Indexed items plus an exact (type, name_norm) -> [items] lookup built once per scan."""
+
+    def __init__(self, items):
+        super().__init__(items)
+        self.exact = {}
+        for item in items:
+            self.exact.setdefault((item.type, item.name_norm), []).append(item)
+
+def invalidate_index():
+    _index_cache.clear()
+    try:
+        os.remove(INDEX_CACHE_FILE)
+    except OSError:
+        pass
+
+# The snapshot lets a restarted Jarvis reuse a fresh index instead of rescanning D:/
+def _load_index_snapshot(cache_key):
+    # Anything unexpected (older row layout, hand-edited file) just means a fresh walk
+    try:
+        with open(INDEX_CACHE_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_SNAPSHOT_VERSION:
+            return None
+        age = time.time() - data.get("ts", 0)
+        if data.get("base_dirs") != sorted(cache_key) or not 0 <= age < INDEX_CACHE_TTL:
+            return None
+        return age, [IndexItem(*row) for row in data["items"]]
+    except (OSError, ValueError, TypeError, AttributeError, KeyError):
+        return None
+
+def _save_index_snapshot(cache_key, items):
+    try:
+        os.makedirs(os.path.dirname(INDEX_CACHE_FILE), exist_ok=True)
+        with open(INDEX_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_SNAPSHOT_VERSION, "base_dirs": sorted(cache_key),
+                       "ts": time.time(), "items": items},
+                      f, ensure_ascii=False)
+    except OSError as e:
+        logger.warning("⚠ Index snapshot save नहीं हो पाया: %s", e)
+
+def _walk_dir(base_dir):
+    # Breadth-first over an explicit queue: no recursion depth limit on deep trees.
+    # DirEntry carries the file type from the directory read itself, so unlike
+    # os.walk + os.path.* there is no extra stat per entry.
+    items = []
+    pending = deque([base_dir])
+    while pending:
+        directory = pending.popleft()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        continue
+                    # Names are normalized once here so search_item never re-processes them
+                    items.append(IndexItem(entry.name, utils.default_process(entry.name),
+                                           entry.path, "folder" if is_dir else "file"))
+                    if is_dir and not entry.is_symlink():
+                        pending.append(entry.path)
+        except OSError:
+            continue  # unreadable dir (permissions, System Volume Information, ...)
+    return items
+
 async def index_items(base_dirs):
-    item_index = []
-    for base_dir in base_dirs:
-        for root, dirs, files in os.walk(base_dir):
-            for d in dirs:
-                item_index.append({"name": d, "path": os.path.join(root, d), "type": "folder"})
-            for f in files:
-                item_index.append({"name": f, "path": os.path.join(root, f), "type": "file"})
-    logger.info(f"✅ Indexed {len(item_index)} items.")
+    cache_key = frozenset(base_dirs)  # hashable and independent of base_dirs order
+    cached = _index_cache.get(cache_key)
+    if cached and time.monotonic() - cached["ts"] < INDEX_CACHE_TTL:
+        return cached["items"]
+
+    snapshot = await asyncio.to_thread(_load_index_snapshot, cache_key)
+    if snapshot:
+        age, items = snapshot
+        item_index = ItemIndex(items)
+        _index_cache[cache_key] = {"items": item_index, "ts": time.monotonic() - age}
+        logger.info("✅ Snapshot से %s items load किए गए।", len(item_index))
+        return item_index
+
+    # Walk every base dir in its own worker thread so the event loop stays free
+    results = await asyncio.gather(*(asyncio.to_thread(_walk_dir, d) for d in base_dirs))
+    item_index = ItemIndex([item for items in results for item in items])
+    _index_cache[cache_key] = {"items": item_index, "ts": time.monotonic()}
+    await asyncio.to_thread(_save_index_snapshot, cache_key, item_index)
+    logger.info("✅ Indexed %s items.", len(item_index))
     return item_index
 
+# Shorter queries ("a", "to") are contained in almost every name, so they skip the substring scan
+MIN_SUBSTRING_QUERY = 3
+
+def exact_match(query_norm, index, item_type):
+    if not query_norm:
+        return None
+    matches = index.exact.get((item_type, query_norm))
+    if matches:
+        if len(matches) > 1:
+            logger.info("⚠ '%s' नाम के %s items हैं, पहला चुना: %s", query_norm, len(matches), matches[0].path)
+        return matches[0]
+    return None
+
+def substring_match(query_norm, index, item_type):
+    # Best-scored containing name wins, not the first one in walk order
+    if len(query_norm) < MIN_SUBSTRING_QUERY:
+        return None
+    hits = [item for item in index if item.type == item_type and query_norm in item.name_norm]
+    if not hits:
+        return None
+    return max(hits, key=lambda item: fuzz.ratio(query_norm, item.name_norm))
+
+def fast_match(query_norm, index, item_type):
+    # d=0 fast path: exact name first, then a substring scan. Most commands
+    # contain the literal name, so this usually avoids Levenshtein work entirely.
+    return exact_match(query_norm, index, item_type) or substring_match(query_norm, index, item_type)
+
 async def search_item(query, index, item_type):
-    filtered = [item for item in index if item["type"] == item_type]
-    choices = [item["name"] for item in filtered]
-    if not choices:
+    query_norm = utils.default_process(query)
+    item = fast_match(query_norm, index, item_type)
+    if item:
+        logger.info("⚡ '%s' का direct match मिला: '%s'", query, item.name)
+        return item
+    # Only the fuzzy fallback needs the per-type list, so an exact hit never builds it
+    filtered = [item for item in index if item.type == item_type]
+    if not filtered:
+        return None
+    # dict choices make extractOne return the key, so no second scan is needed
+    match = process.extractOne(
+        query_norm,
+        {i: item.name_norm for i, item in enumerate(filtered)},
+        scorer=fuzz.WRatio,
+        processor=None,
+        score_cutoff=70,
+    )
+    if match is None:
+        logger.info("🔍 '%s' के लिए कोई match नहीं मिला।", query)
+        return None
+    _, score, key = match
+    item = filtered[key]
+    logger.info("🔍 Matched '%s' to '%s' with score %s", query, item.name, score)
+    return item
+
+async def search_any(query, index, item_types, substring=True):
+    # Scores the whole index in one batched cdist pass, then returns the best
+    # match of the first item_type (in priority order) that clears the cutoff.
+    # An exact name of any type beats a substring hit of a higher-priority type.
+    if not index:
         return None
-    best_match, score = process.extractOne(query, choices)
-    logger.info(f"🔍 Matched '{query}' to '{best_match}' with score {score}")
-    if score > 70:
-        for item in filtered:
-            if item["name"] == best_match:
+    query_norm = utils.default_process(query)
+    matchers = (exact_match, substring_match) if substring else (exact_match,)
+    for matcher in matchers:
+        for item_type in item_types:
+            item = matcher(query_norm, index, item_type)
+            if item:
+                logger.info("⚡ '%s' का direct match मिला: '%s'", query, item.name)
                 return item
+    scores = process.cdist(
+        [query_norm],
+        [item.name_norm for item in index],
+        scorer=fuzz.WRatio,
+        processor=None,
+        score_cutoff=70,
+        workers=-1,
+    )[0]
+    hits = scores.nonzero()[0]
+    for item_type in item_types:
+        typed = [i for i in hits if index[i].type == item_type]
+        if typed:
+            key = max(typed, key=scores.__getitem__)
+            item = index[key]
+            logger.info("🔍 Matched '%s' to '%s' with score %s", query, item.name, scores[key])
+            return item
+    logger.info("🔍 '%s' के लिए कोई match नहीं मिला।", query)
     return None
 
 # File/folder actions
 async def open_folder(path):
     try:
-        os.startfile(path) if os.name == 'nt' else subprocess.call(['xdg-open', path])
-        await focus_window(os.path.basename(path))
+        async with desktop_lock:
+            os.startfile(path) if os.name == 'nt' else subprocess.call(['xdg-open', path])
+            await focus_window(os.path.basename(path))
     except Exception as e:
-        logger.error(f"❌ फ़ाइल open करने में error आया। {e}")
+        logger.error("❌ फ़ाइल open करने में error आया। %s", e)
 
 async def play_file(path):
     try:
-        os.startfile(path) if os.name == 'nt' else subprocess.call(['xdg-open', path])
-        await focus_window(os.path.basename(path))
+        async with desktop_lock:
+            os.startfile(path) if os.name == 'nt' else subprocess.call(['xdg-open', path])
+            await focus_window(os.path.basename(path))
     except Exception as e:
-        logger.error(f"❌ फ़ाइल open करने में error आया।: {e}")
+        logger.error("❌ फ़ाइल open करने में error आया।: %s", e)
 
 async def create_folder(path):
     try:
         os.makedirs(path, exist_ok=True)
+        invalidate_index()
         return f"✅ Folder create हो गया।: {path}"
     except Exception as e:
         return f"❌ फ़ाइल create करने में error आया।: {e}"
@@ -108,6 +294,7 @@ async def create_folder(path):
 async def rename_item(old_path, new_path):
     try:
         os.rename(old_path, new_path)
+        invalidate_index()
         return f"✅ नाम बदलकर {new_path} कर दिया गया।"
     except Exception as e:
         return f"❌ नाम बदलना fail हो गया: {e}"
@@ -118,6 +305,7 @@ async def delete_item(path):
             os.rmdir(path)
         else:
             os.remove(path)
+        invalidate_index()
         return f"🗑️ Deleted: {path}"
     except Exception as e:
         return f"❌ Delete नहीं हुआ।: {e}"
@@ -141,8 +329,9 @@ async def open_app(app_title: str) -> str:
     app_title = app_title.lower().strip()
     app_command = APP_MAPPINGS.get(app_title, app_title)
     try:
-        await asyncio.create_subprocess_shell(f'start "" "{app_command}"', shell=True)
-        focused = await focus_window(app_title)
+        async with desktop_lock:
+            await asyncio.create_subprocess_shell(f'start "" "{app_command}"', shell=True)
+            focused = await focus_window(app_title)
         if focused:
             return f"🚀 App launch हुआ और focus में है: {app_title}."
         else:
@@ -168,15 +357,33 @@ async def close_app(window_title: str) -> str:
     if not win32gui:
         return "❌ win32gui"
 
-    def enumHandler(hwnd, _):
-        if win32gui.IsWindowVisible(hwnd):
-            if window_title.lower() in win32gui.GetWindowText(hwnd).lower():
-                win32gui.PostMessage(hwnd, win32con.WM_CLOSE, 0, 0)
-
-    win32gui.EnumWindows(enumHandler, None)
-    return f"❌ Window बंद हो गई है।: {window_title}"
+    async with desktop_lock:
+        # Fast paths: a handle cached by focus_window, or an exact title via one FindWindow call.
+        # These close just that one window; only the enumeration fallback closes every match.
+        title_lower = window_title.lower()  # computed once, not per enumerated window
+        hwnd = _window_handles.pop(title_lower.strip(), None)
+        if not (hwnd and win32gui.IsWindow(hwnd)
+                and title_lower in win32gui.GetWindowText(hwnd).lower()):
+            try:
+                hwnd = win32gui.FindWindow(None, window_title)
+            except pywintypes.error:
+                hwnd = 0  # pywin32 raises instead of returning 0 when no title matches exactly
+        if hwnd and win32gui.IsWindowVisible(hwnd):
+            win32gui.PostMessage(hwnd, win32con.WM_CLOSE, 0, 0)
+            return f"❌ Window बंद हो गई है।: {window_title}"
+
+        def enumHandler(hwnd, _):
+            if win32gui.IsWindowVisible(hwnd):
+                if title_lower in win32gui.GetWindowText(hwnd).lower():
+                    win32gui.PostMessage(hwnd, win32con.WM_CLOSE, 0, 0)
+
+        win32gui.EnumWindows(enumHandler, None)
+        return f"❌ Window बंद हो गई है।: {window_title}"
 
 # Jarvis command logic
+# One scan finds every intent keyword; folder_file still honours the original priority order
+_INTENT_RE = re.compile(r"(?P<create>create folder)|(?P<rename>rename)|(?P<delete>delete)|(?P<folder>folder)", re.I)
+
 @tool
 async def folder_file(command: str) -> str:
 
@@ -196,39 +403,43 @@ async def folder_file(command: str) -> str:
     folders_to_index = ["D:/"]
     index = await index_items(folders_to_index)
     command_lower = command.lower()
+    intents = {m.lastgroup for m in _INTENT_RE.finditer(command)}
+    # Without the intent keywords the rest is often the literal name, which hits the exact index
+    target = _INTENT_RE.sub(" ", command).strip() or command
 
-    if "create folder" in command_lower:
+    if "create" in intents:
         folder_name = command.replace("create folder", "").strip()
         path = os.path.join("D:/", folder_name)
         return await create_folder(path)
 
-    if "rename" in command_lower:
+    if "rename" in intents:
         parts = command_lower.replace("rename", "").strip().split("to")
         if len(parts) == 2:
             old_name = parts[0].strip()
             new_name = parts[1].strip()
             item = await search_item(old_name, index, "folder")
             if item:
-                new_path = os.path.join(os.path.dirname(item["path"]), new_name)
-                return await rename_item(item["path"], new_path)
+                new_path = os.path.join(os.path.dirname(item.path), new_name)
+                return await rename_item(item.path, new_path)
         return "❌ rename command valid नहीं है।"
 
-    if "delete" in command_lower:
-        item = await search_item(command, index, "folder") or await search_item(command, index, "file")
+    if "delete" in intents:
+        # Deletion only trusts exact names or a scored fuzzy match, never a bare substring hit
+        item = await search_any(target, index, ("folder", "file"), substring=False)
         if item:
-            return await delete_item(item["path"])
+            return await delete_item(item.path)
         return "❌ Delete करने के लिए item नहीं मिला।"
 
-    if "folder" in command_lower or "open folder" in command_lower:
-        item = await search_item(command, index, "folder")
+    if "folder" in intents:
+        item = await search_item(target, index, "folder")
         if item:
-            await open_folder(item["path"])
-            return f"✅ Folder opened: {item['name']}"
+            await open_folder(item.path)
+            return f"✅ Folder opened: {item.name}"
         return "❌ Folder नहीं मिला।."
 
     item = await search_item(command, index, "file")
     if item:
-        await play_file(item["path"])
-        return f"✅ File opened: {item['name']}"
+        await play_file(item.path)
+        return f"✅ File opened: {item.name}"
 
     return "⚠ कुछ भी match नहीं हुआ।"
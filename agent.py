@@ -1,48 +1,98 @@
+import asyncio
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from dotenv import load_dotenv
 from livekit import agents
-from livekit.agents import AgentSession, Agent, RoomInputOptions, ChatContext, ChatMessage
+from livekit.agents import AgentSession, Agent, RoomInputOptions
 from livekit.plugins import google, noise_cancellation
 
 # Import your custom modules
-from Jarvis_prompts import instructions_prompt, Reply_prompts
+from Jarvis_prompts import build_instructions, Reply_prompts
 from memory_loop import MemoryExtractor
-from jarvis_reasoning import thinking_capability
+from jarvis_reasoning import thinking_capability, get_agent
+from jarvis_get_whether import close_http_session
 load_dotenv()
 
+# Hand every log record to a background listener thread, so logging from tools and the
+# memory loop is a queue put instead of a blocking write on the event loop.
+_log_queue = queue.SimpleQueue()
+_root_logger = logging.getLogger()
+_log_listener = QueueListener(_log_queue, *(_root_logger.handlers or [logging.StreamHandler()]),
+                              respect_handler_level=True)
+_root_logger.handlers = [QueueHandler(_log_queue)]
+_log_listener.start()
+atexit.register(_log_listener.stop)
+logger = logging.getLogger(__name__)
+
+
+# One realtime model per worker process; each session opens its own connection from it.
+# No output-token cap: it counts audio tokens and would cut long spoken replies mid-sentence.
+# Reply length is kept short by the prompt instead.
+_REALTIME_MODEL = google.beta.realtime.RealtimeModel(voice="Charon")
+
+# Same noise-cancellation input config for every room; built once per worker process
+_ROOM_INPUT_OPTIONS = RoomInputOptions(
+    noise_cancellation=noise_cancellation.BVC()
+)
+
 
 class Assistant(Agent):
-    def __init__(self, chat_ctx) -> None:
+    def __init__(self, chat_ctx, instructions) -> None:
         super().__init__(chat_ctx = chat_ctx,
-                        instructions=instructions_prompt,
-                        llm=google.beta.realtime.RealtimeModel(voice="Charon"),
+                        instructions=instructions,
+                        llm=_REALTIME_MODEL,
                         tools=[thinking_capability]
                                 )
 
 async def entrypoint(ctx: agents.JobContext):
+    ctx.add_shutdown_callback(close_http_session)
     session = AgentSession(
         preemptive_generation=True
     )
     
     #getting the current memory chat
     current_ctx = session.history.items
+    instructions = await build_instructions()
     
 
     await session.start(
         room=ctx.room,
-        agent=Assistant(chat_ctx=current_ctx), #sending currenet chat to llm in realtime
-        room_input_options=RoomInputOptions(
-            noise_cancellation=noise_cancellation.BVC()
-        ),
+        agent=Assistant(chat_ctx=current_ctx, instructions=instructions), #sending currenet chat to llm in realtime
+        room_input_options=_ROOM_INPUT_OPTIONS,
     )
     await session.generate_reply(
         instructions=Reply_prompts
     )
     conv_ctx = MemoryExtractor()
-    await conv_ctx.run(current_ctx)
+    session.on("conversation_item_added", conv_ctx.notify)
+    # The memory loop lives as long as the session, so run it beside entrypoint
+    # instead of parking entrypoint on it, and stop it when the job shuts down
+    memory_task = asyncio.create_task(conv_ctx.run(current_ctx))
+
+    def report_memory_failure(task):
+        # Nothing awaits the task, so surface a crash here instead of losing it
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            logger.error("❌ Memory loop बंद हो गया: %s", exc, exc_info=exc)
+
+    memory_task.add_done_callback(report_memory_failure)
+
+    async def stop_memory_loop():
+        memory_task.cancel()
+
+    ctx.add_shutdown_callback(stop_memory_loop)
     
 
+def prewarm(proc: agents.JobProcess):
+    # Build the reasoning agent while the worker process idles, not on the first query
+    get_agent()
+
 
 if __name__ == "__main__":
-    agents.cli.run_app(agents.WorkerOptions(entrypoint_fnc=entrypoint))
+    agents.cli.run_app(agents.WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
 
     
\ No newline at end of file
@@ -1,8 +1,11 @@
 import os
+import json
+import time
 import requests
+import aiohttp
+import asyncio
 import logging
 from dotenv import load_dotenv
-from livekit.agents import function_tool  # ✅ Correct decorator
 from langchain.tools import tool
 
 load_dotenv()
@@ -11,14 +14,62 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_http_session = None
+
+def get_http_session():
+    # One ClientSession per process so repeated lookups reuse the connection pool
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession()
+    return _http_session
+
+async def close_http_session():
+    # Called from the job's shutdown path so aiohttp doesn't report an unclosed session
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
+
+# City rarely changes within a session, so keep it for an hour (also across restarts)
+CITY_CACHE_TTL = 3600  # seconds
+CITY_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".jarvis", "city.json")
+_city_cache = {"value": None, "ts": 0}
+
+def _load_city_cache():
+    try:
+        with open(CITY_CACHE_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        _city_cache.update(value=data["value"], ts=data["ts"])
+    except (OSError, ValueError, KeyError):
+        pass
+
+def _save_city_cache():
+    try:
+        os.makedirs(os.path.dirname(CITY_CACHE_FILE), exist_ok=True)
+        with open(CITY_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(_city_cache, f, ensure_ascii=False)
+    except OSError as e:
+        logger.warning("City cache save नहीं हो पाया: %s", e)
+
 async def get_current_city():
+    if _city_cache["value"] is None:
+        await asyncio.to_thread(_load_city_cache)  # file I/O stays off the event loop
+    if _city_cache["value"] and time.time() - _city_cache["ts"] < CITY_CACHE_TTL:
+        return _city_cache["value"]
+
     try:
-        response = requests.get("https://ipinfo.io", timeout=5)
-        data = response.json()
-        return data.get("city", "Unknown")
+        session = get_http_session()
+        async with session.get("https://ipinfo.io", timeout=aiohttp.ClientTimeout(total=5)) as response:
+            data = await response.json()
+        city = data.get("city", "Unknown")
     except Exception as e:
         return "Unknown"
 
+    if city != "Unknown":
+        _city_cache.update(value=city, ts=time.time())
+        await asyncio.to_thread(_save_city_cache)
+    return city
+
 @tool
 async def get_weather(city: str = "") -> str:
 
@@ -43,9 +94,9 @@ async def get_weather(city: str = "") -> str:
         return "Environment variables में OpenWeather API key नहीं मिली।"
 
     if not city:
-        city = get_current_city()
+        city = await get_current_city()
 
-    logger.info(f"City के लिए weather fetch किया जा रहा है।: {city}")
+    logger.info("City के लिए weather fetch किया जा रहा है।: %s", city)
     url = "https://api.openweathermap.org/data/2.5/weather"
     params = {
         "q": city,
@@ -56,7 +107,7 @@ async def get_weather(city: str = "") -> str:
     try:
         response = requests.get(url, params=params)
         if response.status_code != 200:
-            logger.error(f"OpenWeather API में error आया।: {response.status_code} - {response.text}")
+            logger.error("OpenWeather API में error आया।: %s - %s", response.status_code, response.text)
             return f"Error: {city} के लिए weather fetch नहीं कर पाए। कृपया city name चेक करें।"
 
         data = response.json()
@@ -71,10 +122,10 @@ async def get_weather(city: str = "") -> str:
                   f"- Humidity: {humidity}%\n"
                   f"- Wind Speed: {wind_speed} m/s")
 
-        logger.info(f"Weather result: \n{result}")
+        logger.info("Weather result: \n%s", result)
         return result
 
     except Exception as e:
-        logger.exception(f"Weather fetch करते समय exception आया: {e}")
+        logger.exception("Weather fetch करते समय exception आया: %s", e)
         return "Weather fetch करते समय एक error आया"
     
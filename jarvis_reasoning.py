@@ -1,19 +1,95 @@
+import re
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.agents import create_react_agent, AgentExecutor
+from langchain.agents import create_tool_calling_agent
+from langchain_core.agents import AgentFinish
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from dotenv import load_dotenv
 from Jarvis_google_search import google_search, get_current_datetime
 from jarvis_get_whether import get_weather
-from Jarvis_window_CTRL import open_app, close_app, folder_file
+from Jarvis_window_CTRL import open_app, close_app, folder_file, APP_MAPPINGS
 from Jarvis_file_opner import Play_file
 from keyboard_mouse_CTRL import (
     move_cursor_tool, mouse_click_tool, scroll_cursor_tool, 
     type_text_tool, press_key_tool, swipe_gesture_tool, 
     press_hotkey_tool, control_volume_tool)
-from langchain import hub
-import asyncio
 from livekit.agents import function_tool
 load_dotenv()
 
+# The tool registry never changes at runtime, so build it once at import
+_TOOLS = (
+    google_search,
+    get_current_datetime,
+    get_weather,
+    open_app,
+    close_app,
+    folder_file,
+    Play_file,
+    move_cursor_tool,
+    mouse_click_tool,
+    scroll_cursor_tool,
+    type_text_tool,
+    press_key_tool,
+    press_hotkey_tool,
+    control_volume_tool,
+    swipe_gesture_tool,
+)
+
+_TOOLS_BY_NAME = {t.name: t for t in _TOOLS}
+MAX_AGENT_STEPS = 15  # same cap as AgentExecutor's default max_iterations
+
+# Native function calling lets Gemini emit several tool calls in one turn,
+# saving an LLM round-trip per tool compared to a ReAct step per tool.
+_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are Jarvis's reasoning module. Use the available tools to complete the user's task."),
+    ("human", "{input}"),
+    MessagesPlaceholder("agent_scratchpad"),
+])
+
+# Single-step commands that need no LLM round-trip. Only whole-query matches on
+# known app names qualify, so "open notepad and write ..." still goes to the agent.
+_APPS_RE = "|".join(re.escape(name) for name in sorted(APP_MAPPINGS, key=len, reverse=True))
+_FAST_ROUTES = (
+    (re.compile(r"(?:what(?:'s| is) the )?(?:current )?(?:time|date)(?: is it)?(?: now)?\??", re.I),
+     get_current_datetime, lambda m: {}),
+    (re.compile(rf"(?:open|launch|start)\s+({_APPS_RE})", re.I),
+     open_app, lambda m: {"app_title": m.group(1)}),
+    (re.compile(rf"close\s+({_APPS_RE})", re.I),
+     close_app, lambda m: {"window_title": m.group(1)}),
+)
+
+_agent = None
+
+def get_agent():
+    # Model and agent are stateless between queries, so build them once
+    global _agent
+    if _agent is None:
+        model = ChatGoogleGenerativeAI(model="gemini-2.0-flash")  # Updated model name
+        _agent = create_tool_calling_agent(
+            llm=model,
+            tools=list(_TOOLS),
+            prompt=_PROMPT
+        )
+    return _agent
+
+async def _run_agent(query):
+    # AgentExecutor gathers one turn's tool calls concurrently, but most tools here are
+    # order-dependent desktop actions ("open Notepad, then type"). Await them one by one
+    # in the order the model emitted them instead.
+    agent = get_agent()
+    steps = []
+    for _ in range(MAX_AGENT_STEPS):
+        output = await agent.ainvoke({"input": query, "intermediate_steps": steps})
+        if isinstance(output, AgentFinish):
+            return {"input": query, "output": output.return_values["output"]}
+        for action in output:
+            step_tool = _TOOLS_BY_NAME.get(action.tool)
+            if step_tool is None:
+                observation = f"{action.tool} is not a valid tool, try one of [{', '.join(_TOOLS_BY_NAME)}]."
+            else:
+                observation = await step_tool.ainvoke(action.tool_input)
+            steps.append((action, observation))
+    return {"input": query, "output": "Agent stopped due to max iterations."}
+
 @function_tool(
     name="thinking_capability",
     description=(
@@ -29,44 +105,15 @@ async def thinking_capability(query: str) -> dict:
     Takes a natural language query and executes the appropriate workflow.
     """
     
-    model = ChatGoogleGenerativeAI(model="gemini-2.0-flash")  # Updated model name
-    
-    prompt = hub.pull("hwchase17/react")
-    
-    # Define tools list once to avoid duplication
-    tools = [
-        google_search,
-        get_current_datetime,
-        get_weather,
-        open_app,
-        close_app,
-        folder_file,
-        Play_file,
-        move_cursor_tool,
-        mouse_click_tool,
-        scroll_cursor_tool,
-        type_text_tool,
-        press_key_tool,
-        press_hotkey_tool,
-        control_volume_tool,
-        swipe_gesture_tool
-    ]
-
-    agent = create_react_agent(
-        llm=model,
-        tools=tools,
-        prompt=prompt
-    )
-
-    executor = AgentExecutor(
-        agent=agent,
-        tools=tools,  # Use the same tools list
-        verbose=True
-    )
+    query = query.strip()  # stripped once, shared by the fast routes and the agent
 
     try:
-        # Use await instead of asyncio.run() since we're already in async context
-        result = await executor.ainvoke({"input": query})
-        return result
+        for pattern, route_tool, route_args in _FAST_ROUTES:
+            m = pattern.fullmatch(query)
+            if m:
+                output = await route_tool.ainvoke(route_args(m))
+                return {"input": query, "output": output}
+
+        return await _run_agent(query)
     except Exception as e:
         return {"error": f"Agent execution failed: {str(e)}"}
\ No newline at end of file
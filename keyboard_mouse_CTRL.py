@@ -1,13 +1,14 @@
 import pyautogui
 import asyncio
+import atexit
 import time
 from datetime import datetime
 from pynput.keyboard import Key, Controller as KeyboardController
 from pynput.mouse import Button, Controller as MouseController
 from typing import List
-from livekit.agents import function_tool
 from langchain.tools import tool
 import codecs
+from Jarvis_window_CTRL import desktop_lock
 
 # ---------------------
 # SafeController Class
@@ -16,6 +17,7 @@ class SafeController:
     def __init__(self):
         self.active = False
         self.activation_time = None
+        self._log_file = None
         self.keyboard = KeyboardController()
         self.mouse = MouseController()
         self.valid_keys = set("abcdefghijklmnopqrstuvwxyz1234567890")
@@ -33,20 +35,24 @@ class SafeController:
         return self.special_keys.get(key.lower(), key)
 
     def log(self, action: str):
-        with open("control_log.txt", "a") as f:
-            f.write(f"{datetime.now()}: {action}\n")
+        # Kept open and block-buffered; flushed once per action burst in deactivate()
+        if self._log_file is None:
+            self._log_file = open("control_log.txt", "a", buffering=65536)
+            atexit.register(self._log_file.close)
+        self._log_file.write(f"{datetime.now()}: {action}\n")
 
     def activate(self, token=None):
         if token != "my_secret_token":
             self.log("Activation attempt failed.")
             return
         self.active = True
-        self.activation_time = time.time()
+        self.activation_time = time.monotonic()
         self.log("Controller auto-activated.")
 
     def deactivate(self):
         self.active = False
         self.log("Controller auto-deactivated.")
+        self._log_file.flush()
 
     def is_active(self):
         return self.active
@@ -76,7 +82,7 @@ class SafeController:
         try:
             if direction == "up": self.mouse.scroll(0, amount)
             elif direction == "down": self.mouse.scroll(0, -amount)
-        except:
+        except Exception:
             pyautogui.scroll(amount * 100)
         await asyncio.sleep(0.2)
         self.log(f"Mouse scrolled {direction}")
@@ -165,12 +171,27 @@ class SafeController:
 
 controller = SafeController()
 
+# Pending grace-period deactivation; kept referenced so the task isn't garbage collected
+_deactivation_task = None
+
+def _cancel_pending_deactivation():
+    if _deactivation_task and not _deactivation_task.done():
+        _deactivation_task.cancel()
+
+async def _deactivate_later(delay: float):
+    await asyncio.sleep(delay)
+    controller.deactivate()
+
 async def with_temporary_activation(fn, *args, **kwargs):
+    global _deactivation_task
     print(f"🔍 TEMP ACTIVATION: {fn.__name__} | args: {args}")
-    controller.activate("my_secret_token")
-    result = await fn(*args, **kwargs)
-    await asyncio.sleep(2)
-    controller.deactivate()
+    async with desktop_lock:  # keystrokes/clicks wait for earlier launches and focus changes
+        _cancel_pending_deactivation()
+        controller.activate("my_secret_token")
+        result = await fn(*args, **kwargs)
+    # Return the result now; the 2s grace deactivation happens in the background
+    _cancel_pending_deactivation()
+    _deactivation_task = asyncio.create_task(_deactivate_later(2))
     return result
 
 @tool
@@ -1,6 +1,4 @@
 import asyncio
-import hashlib
-import json
 import time
 import logging
 from memory_store import ConversationMemory
@@ -16,6 +14,15 @@ class MemoryExtractor:
     def __init__(self):
         # last_conversation_hash is no longer needed with the new logic
         self.saved_message_count = 0  # Tracks how many messages have been saved.
+        # Set whenever the session adds a chat item; starts set so existing history is saved first.
+        self.history_changed = asyncio.Event()
+        self.history_changed.set()
+
+    def notify(self, *_):
+        """
+        Wakes the run loop. Registered as the session's conversation_item_added handler.
+        """
+        self.history_changed.set()
 
     def _serialize_for_hash(self, obj):
         """
@@ -38,8 +45,9 @@ class MemoryExtractor:
         memory = ConversationMemory("Gaurav_22")
 
         while True:
-            # Check for new messages every 1 second
-            await asyncio.sleep(1)
+            # Sleep until the session reports new messages instead of polling every second
+            await self.history_changed.wait()
+            self.history_changed.clear()
 
             # Assuming the conversation history is a list of message objects
             # within the session object. Adjust 'session.chat_history' if needed.
@@ -47,7 +55,7 @@ class MemoryExtractor:
             
             # This is the core logic: Compare the current count with the saved count.
             if len(current_chat_history) > self.saved_message_count:
-                logging.info(f"{len(current_chat_history) - self.saved_message_count} new message(s) detected. Saving...")
+                logging.info("%s new message(s) detected. Saving...", len(current_chat_history) - self.saved_message_count)
                 
                 # Get a "slice" of the new messages that haven't been saved yet.
                 new_messages = current_chat_history[self.saved_message_count:]
@@ -60,15 +68,17 @@ class MemoryExtractor:
                         "timestamp": time.time()
                     }
                     
-                    success = memory.save_conversation(conversation_wrapper)
+                    # File write happens in a worker thread so the voice loop isn't blocked
+                    success = await asyncio.to_thread(memory.save_conversation, conversation_wrapper)
                     
                     if success:
-                        logging.info(f"Saved new message with ID: {message.id}")
+                        logging.info("Saved new message with ID: %s", message.id)
                     else:
-                        logging.error(f"Failed to save message with ID: {message.id}")
+                        logging.error("Failed to save message with ID: %s", message.id)
                 
-                # After successfully saving all new messages, update the counter.
-                self.saved_message_count = len(current_chat_history)
+                # Advance only past what was sliced: items added while a save was in its
+                # worker thread are still unsaved, and notify() has already re-armed the event.
+                self.saved_message_count += len(new_messages)
             
             else:
                 pass
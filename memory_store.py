@@ -15,26 +15,32 @@ class ConversationMemory:
         self.user_id = user_id
         self.storage_path = storage_path
         self.memory_file = os.path.join(storage_path, f"{user_id}_memory.json")
+        self._memory = None  # Loaded once, then kept in sync with the file on every write
         
         # Create storage directory if it doesn't exist
         os.makedirs(storage_path, exist_ok=True)
-        logger.info(f"ConversationMemory initialized for user: {user_id}")
-        logger.info(f"Memory file path: {os.path.abspath(self.memory_file)}")   
+        logger.info("ConversationMemory initialized for user: %s", user_id)
+        logger.info("Memory file path: %s", os.path.abspath(self.memory_file))   
     
     def load_memory(self) -> List[Dict]:
         """Load all past conversations for this user"""
+        if self._memory is not None:
+            return self._memory
+        
         if os.path.exists(self.memory_file):
             try:
                 with open(self.memory_file, 'r', encoding="utf-8") as f:
                     data = json.load(f)
-                    logger.info(f"Loaded {len(data)} conversations from memory for user {self.user_id}")
-                    return data
+                    logger.info("Loaded %s conversations from memory for user %s", len(data), self.user_id)
             except (json.JSONDecodeError, FileNotFoundError) as e:
-                logger.error(f"Error loading memory file: {e}")
-                return []
+                logger.error("Error loading memory file: %s", e)
+                data = []
         else:
-            logger.info(f"No existing memory file found for user {self.user_id}")
-            return []
+            logger.info("No existing memory file found for user %s", self.user_id)
+            data = []
+        
+        self._memory = data
+        return data
     
     def _conversation_exists(self, new_conversation: Dict, existing_conversations: List[Dict]) -> bool:
         """Check if a conversation already exists in memory"""
@@ -55,7 +61,7 @@ class ConversationMemory:
     
     def save_conversation(self, conversation: Union[Dict, object]) -> bool:
         """Save a conversation to memory - returns True if successful"""
-        logger.info(f"save_conversation called for user {self.user_id}")
+        logger.info("save_conversation called for user %s", self.user_id)
         
         try:
             memory = self.load_memory()
@@ -78,21 +84,24 @@ class ConversationMemory:
             # If this is an update to the last conversation, replace it instead of adding
             if memory and self._is_conversation_update(conversation_dict, memory[-1]):
                 logger.info("Updating last conversation instead of adding new one")
-                memory[-1] = conversation_dict
+                updated = memory[:-1] + [conversation_dict]
             else:
                 # Add new conversation
-                memory.append(conversation_dict)
+                updated = memory + [conversation_dict]
             
-            # Save to file
+            # Serialize before opening the file, so an unserializable entry neither
+            # truncates it nor ends up in the cache
+            data = json.dumps(updated, indent=2, ensure_ascii=False)
             with open(self.memory_file, 'w', encoding='utf-8') as f:
-                json.dump(memory, f, indent=2, ensure_ascii=False)
+                f.write(data)
+            self._memory = updated
             
-            logger.info(f"Successfully saved conversation for user {self.user_id}")
-            logger.info(f"File saved at: {os.path.abspath(self.memory_file)}")
+            logger.info("Successfully saved conversation for user %s", self.user_id)
+            logger.info("File saved at: %s", os.path.abspath(self.memory_file))
             return True
             
         except Exception as e:
-            logger.error(f"Error saving conversation: {e}")
+            logger.error("Error saving conversation: %s", e)
             return False
     
     def _is_conversation_update(self, new_conv: Dict, last_conv: Dict) -> bool:
@@ -124,7 +133,7 @@ class ConversationMemory:
         
         # Return the most recent messages
         recent_messages = all_messages[-max_messages:] if all_messages else []
-        logger.info(f"Retrieved {len(recent_messages)} recent messages for user {self.user_id}")
+        logger.info("Retrieved %s recent messages for user %s", len(recent_messages), self.user_id)
         return recent_messages
     
     def get_conversation_count(self) -> int:
@@ -147,6 +156,7 @@ class ConversationMemory:
         if removed_count > 0:
             with open(self.memory_file, 'w', encoding='utf-8') as f:
                 json.dump(unique_conversations, f, indent=2, ensure_ascii=False)
-            logger.info(f"Removed {removed_count} duplicate conversations")
+            self._memory = unique_conversations
+            logger.info("Removed %s duplicate conversations", removed_count)
         
         return removed_count
\ No newline at end of file